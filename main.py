@@ -1,3 +1,5 @@
+import math
+
 from utils.file_handler import *
 from utils.data_processor import *
 from utils.api_handler import *
@@ -62,10 +64,18 @@ def main():
 
         # Get available regions and amount range
         if transactions:
-            regions = sorted(list(set(t['Region'] for t in transactions)))
-            amounts = [t['Quantity'] * t['UnitPrice'] for t in transactions]
-            min_amount = min(amounts)
-            max_amount = max(amounts)
+            # one pass for the region set and the amount range
+            region_set = set()
+            min_amount = math.inf
+            max_amount = -math.inf
+            for t in transactions:
+                region_set.add(t['Region'])
+                amount = t['Amount']
+                if amount < min_amount:
+                    min_amount = amount
+                if amount > max_amount:
+                    max_amount = amount
+            regions = sorted(region_set)
 
             print(f"Regions: {', '.join(regions)}")
             print(f"Amount Range: ₹{min_amount:,.0f} - ₹{max_amount:,.0f}")
@@ -105,9 +115,15 @@ def main():
         print(f"✓ Valid: {len(validated_transactions)} | Invalid: {invalid_count}")
         print()
 
-        # 7 Display validation summary / analysis placeholder
+        # 7 Perform all data analyses (aggregate once, show the headline numbers)
         print("[5/10] Analyzing sales data...")
+        aggregates = collect_all_stats(validated_transactions)
+        total_revenue = calculate_total_revenue(validated_transactions, aggregates)
+        peak_date, peak_revenue, _ = find_peak_sales_day(validated_transactions, aggregates)
         print("✓ Analysis complete")
+        print(f"  Total Revenue: ₹{total_revenue:,.2f}")
+        if peak_date is not None:
+            print(f"  Peak Day: {peak_date} (₹{peak_revenue:,.2f})")
         print()
 
         # 8 Fetch products from API
@@ -128,7 +144,7 @@ def main():
 
         # 11 Generate sales report
         print("[9/10] Generating report...")
-        generate_sales_report(validated_transactions, enriched_transactions)
+        generate_sales_report(validated_transactions, enriched_transactions, aggregates=aggregates)
         print()
 
         # 12 Display completion message
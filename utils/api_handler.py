@@ -1,4 +1,18 @@
+import re
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# shared session so repeated API calls reuse the same TCP/TLS connection
+# transient server errors and rate limits are retried with backoff
+# read timeouts are not retried (read=False) so they still raise Timeout
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=8,
+    pool_maxsize=8,
+    max_retries=Retry(total=3, status_forcelist=[429, 500, 502, 503, 504], backoff_factor=0.3, read=False)
+))
 
 def fetch_all_products():
     """
@@ -6,11 +20,13 @@ def fetch_all_products():
 
     Returns: list of product dictionaries
     """
-    url = "https://dummyjson.com/products?limit=0"
+    # only ask for the fields create_product_mapping() actually uses
+    url = "https://dummyjson.com/products?limit=0&select=id,title,category,brand,rating"
 
     try:
         print(f"   > Connecting to {url}...")
-        response = requests.get(url, timeout=10)
+        # separate connect and read timeouts
+        response = _SESSION.get(url, timeout=(3.05, 10))
 
         # check if the request was successful (status code 200)
         response.raise_for_status()
@@ -61,7 +77,8 @@ def create_product_mapping(api_products):
 
     return mapping
 
-import re
+# compiled once, used for ProductIDs that aren't in the plain P<digits> form
+_PID_RE = re.compile(r'\d+')
 
 def enrich_sales_data(transactions, product_mapping):
     """
@@ -74,15 +91,19 @@ def enrich_sales_data(transactions, product_mapping):
         new_t = t.copy()
 
         # safely get ProductID (default to empty string if missing)
-        p_id_str = new_t.get('ProductID', '')
+        p_id_str = str(new_t.get('ProductID', ''))
 
-        # extract numeric ID using regex
-        match = re.search(r'\d+', str(p_id_str))
+        # extract numeric ID, skipping the regex for the usual P101 format
+        numeric_id = None
+        if p_id_str.startswith('P') and p_id_str[1:].isdecimal():
+            numeric_id = int(p_id_str[1:])
+        else:
+            match = _PID_RE.search(p_id_str)
+            if match:
+                numeric_id = int(match.group())
 
         api_match = False
-        if match:
-            numeric_id = int(match.group())
-
+        if numeric_id is not None:
             # check if this ID exists in our API data
             if numeric_id in product_mapping:
                 api_info = product_mapping[numeric_id]
@@ -103,41 +124,45 @@ def enrich_sales_data(transactions, product_mapping):
 
     return enriched_data
 
+# the exact column order required in the enriched file
+_ENRICHED_HEADERS = (
+    'TransactionID', 'Date', 'ProductID', 'ProductName',
+    'Quantity', 'UnitPrice', 'CustomerID', 'Region',
+    'API_Category', 'API_Brand', 'API_Rating', 'API_Match'
+)
+
+# one "{}|{}|...|{}" template, so each row is built by a single format call
+_ENRICHED_ROW = "|".join(["{}"] * len(_ENRICHED_HEADERS)).format
+
 def save_enriched_data(enriched_transactions, filename='data/enriched_sales_data.txt'):
     """
     Saves enriched transactions back to file with pipe delimiter
-    """
-    if not enriched_transactions:
-        print("- No enriched data to save.")
-        return
 
-    # define the exact column order required
-    headers = [
-        'TransactionID', 'Date', 'ProductID', 'ProductName',
-        'Quantity', 'UnitPrice', 'CustomerID', 'Region',
-        'API_Category', 'API_Brand', 'API_Rating', 'API_Match'
-    ]
+    enriched_transactions can be any iterable of dictionaries (list or generator)
 
+    Returns: number of rows written
+    """
     try:
+        # 1. build header + rows (pipe delimited) in memory first
+        # missing/None values come out as the string 'None'
+        buf = ["|".join(_ENRICHED_HEADERS)]
+        for t in enriched_transactions:
+            buf.append(_ENRICHED_ROW(*map(t.get, _ENRICHED_HEADERS)))
+
+        # count rows here since a generator has no len() and is always truthy
+        count = len(buf) - 1
+        if count == 0:
+            print("- No enriched data to save.")
+            return 0
+
+        # 2. write everything with a single call
         with open(filename, 'w', encoding='utf-8') as f:
-            # 1. Write Header (Pipe delimited)
-            f.write("|".join(headers) + "\n")
-
-            # 2. write Rows
-            for t in enriched_transactions:
-                row_values = []
-                for field in headers:
-                    val = t.get(field)
-
-                    # handle None values (convert to string 'None' or empty)
-                    if val is None:
-                        row_values.append('None')
-                    else:
-                        row_values.append(str(val))
-
-                f.write("|".join(row_values) + "\n")
+            f.write("\n".join(buf))
+            f.write("\n")
 
         print(f"✓ Enriched data saved to: {filename}")
+        return count
 
     except Exception as e:
         print(f"- Error saving enriched data: {e}")
+        return 0
@@ -1,55 +1,135 @@
+import heapq
+import math
+from collections import defaultdict
+from dataclasses import dataclass, field
+from operator import itemgetter
+from typing import Optional
+
+# ------------------------------------SHARED AGGREGATION----------------------------
+
+@dataclass
+class _Aggregates:
+    """
+    Raw per-group totals shared by all the analysis functions
+
+    Each group maps its key to a small list that is updated by index:
+    - region:   [total_sales, transaction_count]
+    - product:  [total_qty, total_revenue]
+    - customer: [total_spent, purchase_count, products_list]
+    - daily:    [revenue, transaction_count, unique_customers]
+
+    peak_date/peak_revenue hold the highest-revenue day (first one wins on ties)
+    """
+    total_revenue: float = 0.0
+    peak_date: Optional[str] = None
+    peak_revenue: float = -1.0
+    region: dict = field(default_factory=lambda: defaultdict(lambda: [0.0, 0]))
+    product: dict = field(default_factory=lambda: defaultdict(lambda: [0, 0.0]))
+    customer: dict = field(default_factory=lambda: defaultdict(lambda: [0.0, 0, []]))
+    daily: dict = field(default_factory=lambda: defaultdict(lambda: [0.0, 0, 0]))
+
+def collect_all_stats(transactions):
+    """
+    Aggregates region, product, customer and daily stats in a single pass
+
+    Build this once and pass it to the analysis functions below so they
+    only have to sort/format instead of re-reading every transaction
+
+    Returns: _Aggregates
+    """
+
+    aggs = _Aggregates()
+    region_stats = aggs.region
+    product_stats = aggs.product
+    customer_stats = aggs.customer
+    daily_stats = aggs.daily
+
+    # one shared set of (date, customer) pairs instead of a set per day
+    seen_day_customers = set()
+
+    # one loop feeds every group dictionary
+    for t in transactions:
+        region = t['Region']
+        p_name = t['ProductName']
+        c_id = t['CustomerID']
+        date = t['Date']
+        qty = t['Quantity']
+        amount = t['Amount']  # cached by parse_transactions
+
+        # defaultdict creates the slot list on first sight, so no membership check
+        s = region_stats[region]
+        s[0] += amount
+        s[1] += 1
+
+        s = product_stats[p_name]
+        s[0] += qty
+        s[1] += amount
+
+        s = customer_stats[c_id]
+        s[0] += amount
+        s[1] += 1
+        s[2].append(p_name)  # deduplicated once in customer_analysis
+
+        s = daily_stats[date]
+        s[0] += amount
+        s[1] += 1
+
+        day_customer = (date, c_id)
+        if day_customer not in seen_day_customers:
+            seen_day_customers.add(day_customer)
+            s[2] += 1
+
+    # exact (correctly rounded) sum of the cached amounts, done in C
+    aggs.total_revenue = math.fsum(map(itemgetter('Amount'), transactions))
+
+    # find the day with max revenue once the daily totals are final
+    for date, (revenue, _, _) in daily_stats.items():
+        if revenue > aggs.peak_revenue:
+            aggs.peak_revenue = revenue
+            aggs.peak_date = date
+
+    return aggs
+
 # ------------------------------------SALES SUMMARY CALCULATOR----------------------------
 
-def calculate_total_revenue(transactions):
+def calculate_total_revenue(transactions, aggregates=None):
     """
     Calculates total revenue from all transactions
 
+    Parameters:
+    - aggregates: prebuilt result of collect_all_stats() (optional)
+
     Returns: float (total revenue)
     """
 
-    # initialize total
-    total_revenue = 0.0
-
-    # loop through transactions and sum up quantity * price
-    for t in transactions:
-        amount = t['Quantity'] * t['UnitPrice']
-        total_revenue += amount
+    if aggregates is None:
+        aggregates = collect_all_stats(transactions)
 
-    return total_revenue
+    return aggregates.total_revenue
 
-def region_wise_sales(transactions):
+def region_wise_sales(transactions, aggregates=None):
     """
     Analyzes sales by region
 
+    Parameters:
+    - aggregates: prebuilt result of collect_all_stats() (optional)
+
     Returns: dictionary with region statistics
     """
 
-    # dictionary to store raw totals first
-    region_stats = {}
-    total_revenue_all = 0.0
+    if aggregates is None:
+        aggregates = collect_all_stats(transactions)
 
-    # first pass: aggregate sales and counts
-    for t in transactions:
-        region = t['Region']
-        amount = t['Quantity'] * t['UnitPrice']
-
-        if region not in region_stats:
-            region_stats[region] = {'total_sales': 0.0, 'transaction_count': 0}
+    region_stats = aggregates.region
+    total_revenue_all = aggregates.total_revenue
 
-        region_stats[region]['total_sales'] += amount
-        region_stats[region]['transaction_count'] += 1
-        total_revenue_all += amount
-
-    # second pass: calculate percentages and format final output
+    # calculate percentages and format final output
     final_output = {}
 
     # sort regions by total_sales descending (highest to lowest) lambda function used for sorting
-    sorted_regions = sorted(region_stats.items(), key=lambda x: x[1]['total_sales'], reverse=True)
-
-    for region, stats in sorted_regions:
-        sales = stats['total_sales']
-        count = stats['transaction_count']
+    sorted_regions = sorted(region_stats.items(), key=lambda x: x[1][0], reverse=True)
 
+    for region, (sales, count) in sorted_regions:
         # div/0 check
         if total_revenue_all > 0:
             percentage = (sales / total_revenue_all) * 100
@@ -64,74 +144,47 @@ def region_wise_sales(transactions):
 
     return final_output
 
-def top_selling_products(transactions, n=5):
+def top_selling_products(transactions, n=5, aggregates=None):
     """
     Finds top n products by total quantity sold
 
+    Parameters:
+    - aggregates: prebuilt result of collect_all_stats() (optional)
+
     Returns list of tuples
     """
 
-    # dictionary to aggregate product stats
-    product_stats = {}
-
-    for t in transactions:
-        p_name = t['ProductName']
-        qty = t['Quantity']
-        revenue = qty * t['UnitPrice']
-
-        if p_name not in product_stats:
-            product_stats[p_name] = {'total_qty': 0, 'total_revenue': 0.0}
-
-        product_stats[p_name]['total_qty'] += qty
-        product_stats[p_name]['total_revenue'] += revenue
+    if aggregates is None:
+        aggregates = collect_all_stats(transactions)
 
     # convert to list of tuples for sorting items
     # tuple format (ProductName, TotalQuantity, TotalRevenue)
     stats_list = []
-    for name, data in product_stats.items():
-        stats_list.append((name, data['total_qty'], data['total_revenue']))
-
-    # sort by quantity in descending order
-    sorted_products = sorted(stats_list, key=lambda x: x[1], reverse=True)
+    for name, (qty, revenue) in aggregates.product.items():
+        stats_list.append((name, qty, revenue))
 
-    # return top n items
-    return sorted_products[:n]
+    # pick the top n by quantity (descending) without sorting the whole list
+    return heapq.nlargest(n, stats_list, key=itemgetter(1))
 
-def customer_analysis(transactions):
+def customer_analysis(transactions, aggregates=None):
     """
     Analyzes customer purchase patterns
 
+    Parameters:
+    - aggregates: prebuilt result of collect_all_stats() (optional)
+
     Returns dictionary of customer statistics
     """
 
-    # dictionary to aggregate raw customer data
-    customer_stats = {}
-
-    for t in transactions:
-        c_id = t['CustomerID']
-        amount = t['Quantity'] * t['UnitPrice']
-        p_name = t['ProductName']
-
-        if c_id not in customer_stats:
-            customer_stats[c_id] = {
-                'total_spent': 0.0,
-                'purchase_count': 0,
-                'products_set': set()  # to keep products unique (set is unique)
-            }
-
-        customer_stats[c_id]['total_spent'] += amount
-        customer_stats[c_id]['purchase_count'] += 1
-        customer_stats[c_id]['products_set'].add(p_name)
+    if aggregates is None:
+        aggregates = collect_all_stats(transactions)
 
     # sort customers by total_spent descending
-    sorted_customers = sorted(customer_stats.items(), key=lambda x: x[1]['total_spent'], reverse=True)
+    sorted_customers = sorted(aggregates.customer.items(), key=lambda x: x[1][0], reverse=True)
 
     final_output = {}
 
-    for c_id, stats in sorted_customers:
-        spent = stats['total_spent']
-        count = stats['purchase_count']
-
+    for c_id, (spent, count, products_list) in sorted_customers:
         # calculate average order value
         if count > 0:
             avg_value = spent / count
@@ -142,38 +195,27 @@ def customer_analysis(transactions):
             'total_spent': round(spent, 2),
             'purchase_count': count,
             'avg_order_value': round(avg_value, 2),
-            'products_bought': list(stats['products_set']) # convert set back to list
+            'products_bought': list(dict.fromkeys(products_list)) # unique, in first-bought order
         }
 
     return final_output
 
 # ------------------------------------DATE BASED ANALYSIS----------------------------
 
-def daily_sales_trend(transactions):
+def daily_sales_trend(transactions, aggregates=None):
     """
     Analyzes sales trends by date
 
+    Parameters:
+    - aggregates: prebuilt result of collect_all_stats() (optional)
+
     Returns dictionary sorted by date
     """
 
-    # dictionary to aggregate daily stats
-    daily_stats = {}
+    if aggregates is None:
+        aggregates = collect_all_stats(transactions)
 
-    for t in transactions:
-        date = t['Date']
-        amount = t['Quantity'] * t['UnitPrice']
-        c_id = t['CustomerID']
-
-        if date not in daily_stats:
-            daily_stats[date] = {
-                'revenue': 0.0,
-                'transaction_count': 0,
-                'customers_set': set() # using set for unique counting
-            }
-
-        daily_stats[date]['revenue'] += amount
-        daily_stats[date]['transaction_count'] += 1
-        daily_stats[date]['customers_set'].add(c_id)
+    daily_stats = aggregates.daily
 
     # sort dates chronologically
     sorted_dates = sorted(daily_stats.keys())
@@ -181,81 +223,58 @@ def daily_sales_trend(transactions):
     final_output = {}
 
     for date in sorted_dates:
-        stats = daily_stats[date]
+        revenue, count, customers = daily_stats[date]
 
         final_output[date] = {
-            'revenue': round(stats['revenue'], 2),
-            'transaction_count': stats['transaction_count'],
-            'unique_customers': len(stats['customers_set'])
+            'revenue': round(revenue, 2),
+            'transaction_count': count,
+            'unique_customers': customers
         }
 
     return final_output
 
-def find_peak_sales_day(transactions):
+def find_peak_sales_day(transactions, aggregates=None):
     """
     Identifies the date with highest revenue
 
+    Parameters:
+    - aggregates: prebuilt result of collect_all_stats() (optional)
+
     Returns tuple (date, revenue, transaction_count)
     """
 
-    # dictionary to store daily totals
-    daily_totals = {}
-
-    for t in transactions:
-        date = t['Date']
-        amount = t['Quantity'] * t['UnitPrice']
-
-        if date not in daily_totals:
-            daily_totals[date] = {'revenue': 0.0, 'count': 0}
+    if aggregates is None:
+        aggregates = collect_all_stats(transactions)
 
-        daily_totals[date]['revenue'] += amount
-        daily_totals[date]['count'] += 1
+    # the peak day is found once by collect_all_stats, just look up its count
+    peak_date = aggregates.peak_date
+    peak_count = aggregates.daily[peak_date][1] if peak_date is not None else 0
 
-    # find the day with max revenue
-    peak_date = None
-    max_revenue = -1.0
-    peak_count = 0
-
-    for date, stats in daily_totals.items():
-        if stats['revenue'] > max_revenue:
-            max_revenue = stats['revenue']
-            peak_date = date
-            peak_count = stats['count']
-
-    return (peak_date, round(max_revenue, 2), peak_count)
+    return (peak_date, round(aggregates.peak_revenue, 2), peak_count)
 
 # ------------------------------------PRODUCT PERFORMANCE----------------------------
 
-def low_performing_products(transactions, threshold=10):
+def low_performing_products(transactions, threshold=10, aggregates=None):
     """
     Identifies products with low sales
 
+    Parameters:
+    - aggregates: prebuilt result of collect_all_stats() (optional)
+
     Returns list of tuples
     """
 
-    # dictionary to aggregate product stats
-    product_stats = {}
-
-    for t in transactions:
-        p_name = t['ProductName']
-        qty = t['Quantity']
-        revenue = qty * t['UnitPrice']
-
-        if p_name not in product_stats:
-            product_stats[p_name] = {'total_qty': 0, 'total_revenue': 0.0}
-
-        product_stats[p_name]['total_qty'] += qty
-        product_stats[p_name]['total_revenue'] += revenue
+    if aggregates is None:
+        aggregates = collect_all_stats(transactions)
 
     # filter products below threshold and convert to tuple list
     low_performers = []
 
-    for name, data in product_stats.items():
-        qty = data['total_qty']
+    for name, (qty, revenue) in aggregates.product.items():
         if qty < threshold:
-            low_performers.append((name, qty, data['total_revenue']))
+            low_performers.append((name, qty, revenue))
 
     # sort by quantity (index 1) in ascending order (lowest first)
-    sorted_low_performers = sorted(low_performers, key=lambda x: x[1])
+    sorted_low_performers = sorted(low_performers, key=itemgetter(1))
 
     return sorted_low_performers
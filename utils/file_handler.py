@@ -1,4 +1,5 @@
 import os
+import sys
 
 def read_sales_data(filename):
     """
@@ -9,28 +10,26 @@ def read_sales_data(filename):
         print(f"Error: File '{filename}' not found.")
         return []
 
-    encodings = ['utf-8', 'latin-1', 'cp1252']
-    lines = []
-    read_success = False
+    # read the raw bytes once, then decode in memory
+    try:
+        with open(filename, 'rb') as f:
+            raw = f.read()
+    except Exception as e:
+        print(f"Error reading file: {e}")
+        return []
 
-    for enc in encodings:
-        try:
-            with open(filename, 'r', encoding=enc) as f:
-                lines = f.readlines()
-            read_success = True
-            break
-        except UnicodeDecodeError:
-            continue
-        except Exception as e:
-            print(f"Error reading file: {e}")
-            return []
+    try:
+        text = raw.decode('utf-8')
+    except UnicodeDecodeError:
+        # latin-1 maps every byte, so this fallback can't fail
+        text = raw.decode('latin-1')
 
-    if not read_success:
-        print("Error: Could not read file with supported encodings.")
-        return []
+    # split on real line endings only (\n, \r\n, \r), like text-mode readlines()
+    # str.splitlines() would also break on \x0c, \x85, \u2028 etc. inside fields
+    lines = text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
 
-    # remove empty lines and strip whitespace
-    cleaned_lines = [l.strip() for l in lines if l.strip()]
+    # strip whitespace once per line and drop the empty ones
+    cleaned_lines = [l for l in map(str.strip, lines) if l]
 
     # skip the header row
     if len(cleaned_lines) > 0:
@@ -44,7 +43,10 @@ def parse_transactions(raw_lines):
 
     Returns: list of dictionaries with keys:
     ['TransactionID', 'Date', 'ProductID', 'ProductName',
-     'Quantity', 'UnitPrice', 'CustomerID', 'Region']
+     'Quantity', 'UnitPrice', 'CustomerID', 'Region', 'Amount']
+
+    'Amount' is Quantity * UnitPrice, computed once here so the rest of
+    the pipeline doesn't have to recompute it
     """
     cleaned_data = []
 
@@ -69,15 +71,18 @@ def parse_transactions(raw_lines):
             unit_price = float(price_str.replace(',', ''))
 
             # Create the dictionary
+            # intern the heavily repeated grouping keys so equal values share
+            # one string object (cheaper dict lookups when aggregating)
             transaction = {
                 'TransactionID': t_id,
-                'Date': date,
+                'Date': sys.intern(date),
                 'ProductID': p_id,
-                'ProductName': clean_p_name,
+                'ProductName': sys.intern(clean_p_name),
                 'Quantity': qty,
                 'UnitPrice': unit_price,
-                'CustomerID': c_id,
-                'Region': region
+                'CustomerID': sys.intern(c_id),
+                'Region': sys.intern(region),
+                'Amount': qty * unit_price
             }
 
             cleaned_data.append(transaction)
@@ -95,7 +100,7 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
     Parameters:
     - transactions: list of transaction dictionaries
     - region: filter by specific region (optional)
-    - min_amount: minimum transaction amount (Quantity * UnitPrice) (optional)
+    - min_amount: minimum transaction amount ('Amount') (optional)
     - max_amount: maximum transaction amount (optional)
 
     Returns tuple (valid_transactions, invalid_count, filter_summary)
@@ -103,14 +108,19 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
 
     # initialize counters
     total_input = len(transactions)
-    valid_transactions = []
+    final_list = []
     invalid_count = 0
+    valid_count = 0
+    removed_by_region = 0
+    removed_by_amount = 0
 
-    # validate transaction rules
+    # validate and filter in the same pass
     for t in transactions:
         try:
             # check for empty or missing values
-            if not all(t.values()):
+            # (ids and numbers are covered by the prefix/positivity checks below)
+            if not (t['Date'] and t['ProductID'] and t['ProductName']
+                    and t['CustomerID'] and t['Region']):
                 invalid_count += 1
                 continue
 
@@ -124,47 +134,35 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
                 invalid_count += 1
                 continue
 
-            # if all checks pass, add to valid list
-            valid_transactions.append(t)
-
         except (KeyError, AttributeError, TypeError):
             # catch any structural errors
             invalid_count += 1
             continue
 
-    # calculate statistics for user display
-    if valid_transactions:
-        # get unique regions
-        available_regions = sorted(list(set(t['Region'] for t in valid_transactions)))
-
-        # calculate amounts
-        amounts = [t['Quantity'] * t['UnitPrice'] for t in valid_transactions]
-        min_avail = min(amounts)
-        max_avail = max(amounts)
-
-    # apply filters
-    filtered_list = valid_transactions
-    initial_valid_count = len(valid_transactions)
+        # all checks passed
+        valid_count += 1
 
-    # filter by region
-    if region:
-        filtered_list = [t for t in filtered_list if t['Region'] == region]
+        # amount is cached by parse_transactions; fill it in for dicts built elsewhere
+        amount = t.get('Amount')
+        if amount is None:
+            amount = t['Amount'] = t['Quantity'] * t['UnitPrice']
 
-    count_after_region = len(filtered_list)
-    removed_by_region = initial_valid_count - count_after_region
+        # filter by region
+        if region and t['Region'] != region:
+            removed_by_region += 1
+            continue
 
-    # filter by amount range
-    final_list = []
-    for t in filtered_list:
-        amount = t['Quantity'] * t['UnitPrice']
+        # filter by amount range
         if min_amount is not None and amount < min_amount:
+            removed_by_amount += 1
             continue
         if max_amount is not None and amount > max_amount:
+            removed_by_amount += 1
             continue
+
         final_list.append(t)
 
     count_after_amount = len(final_list)
-    removed_by_amount = count_after_region - count_after_amount
 
     # create summary dictionary
     filter_summary = {
@@ -177,6 +175,6 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
     # print EXACT output format required
     print(f"Total records parsed: {total_input}")
     print(f"Invalid records removed: {invalid_count}")
-    print(f"Valid records after cleaning: {len(valid_transactions)}")
+    print(f"Valid records after cleaning: {valid_count}")
 
     return final_list, invalid_count, filter_summary
@@ -1,7 +1,52 @@
+import heapq
+import os
 from datetime import datetime
-
-
-def generate_sales_report(transactions, enriched_transactions, output_file='output/sales_report.txt'):
+from operator import itemgetter
+
+from utils.data_processor import collect_all_stats
+
+# separators and static section heads, built once at import
+_EQ = "=" * 50
+_SEP = "-" * 50
+_TITLE = " " * 10 + "SALES ANALYTICS REPORT"
+
+_REGION_HEAD = (
+    "REGION-WISE PERFORMANCE\n"
+    f"{_SEP}\n"
+    f"{'Region':<15} {'Sales':<20} {'% of Total':<15} {'Transactions':<10}\n"
+    f"{_SEP}\n"
+)
+_PRODUCT_HEAD = (
+    "TOP 5 PRODUCTS\n"
+    f"{_SEP}\n"
+    f"{'Rank':<6} {'Product Name':<25} {'Quantity':<10} {'Revenue':<15}\n"
+    f"{_SEP}\n"
+)
+_CUSTOMER_HEAD = (
+    "TOP 5 CUSTOMERS\n"
+    f"{_SEP}\n"
+    f"{'Rank':<6} {'Customer ID':<15} {'Total Spent':<20} {'Order Count':<10}\n"
+    f"{_SEP}\n"
+)
+_DAILY_HEAD = (
+    "DAILY SALES TREND\n"
+    f"{_SEP}\n"
+    f"{'Date':<15} {'Revenue':<20} {'Transactions':<15} {'Unique Customers':<15}\n"
+    f"{_SEP}\n"
+)
+# no trailing newline after the closing rule
+_FOOTER = f"\n{_EQ}\nEND OF REPORT\n{_EQ}"
+
+# row templates parsed once and bound to str.format, reused for every table row
+_REGION_ROW = "{:<15} ₹{:>17,.2f}  {:>6.2f}%      {:>6}\n".format
+_PRODUCT_ROW = "{:<6} {:<25} {:<10} ₹{:>12,.2f}\n".format
+_CUSTOMER_ROW = "{:<6} {:<15} ₹{:>17,.2f}  {:>6}\n".format
+_DAILY_ROW = "{:<15} ₹{:>17,.2f}  {:>6}           {:>6}\n".format
+_LOW_PRODUCT_ROW = "  - {}: {} units - ₹{:,.2f}\n".format
+_REGION_AVG_ROW = "  - {}: ₹{:,.2f}\n".format
+
+
+def generate_sales_report(transactions, enriched_transactions, output_file='output/sales_report.txt', aggregates=None):
     """
     Generates a comprehensive formatted text report
 
@@ -43,226 +88,185 @@ def generate_sales_report(transactions, enriched_transactions, output_file='outp
        - Total products enriched
        - Success rate percentage
        - List of products that couldn't be enriched
-    """
-
-    try:
-        # calculate all required metrics
-        total_revenue = 0.0
-        total_transactions = len(transactions)
-
-        if total_transactions == 0:
-            print("- No transactions to report")
-            return
-
-        for t in transactions:
-            amount = t['Quantity'] * t['UnitPrice']
-            total_revenue += amount
-
-        avg_order_value = total_revenue / total_transactions if total_transactions > 0 else 0.0
-
-        # get date range
-        dates = sorted([t['Date'] for t in transactions])
-        date_range_start = dates[0] if dates else "N/A"
-        date_range_end = dates[-1] if dates else "N/A"
-
-        # region-wise analysis
-        region_stats = {}
-        for t in transactions:
-            region = t['Region']
-            amount = t['Quantity'] * t['UnitPrice']
-
-            if region not in region_stats:
-                region_stats[region] = {'total_sales': 0.0, 'transaction_count': 0}
-
-            region_stats[region]['total_sales'] += amount
-            region_stats[region]['transaction_count'] += 1
-
-        # product analysis
-        product_stats = {}
-        for t in transactions:
-            p_name = t['ProductName']
-            qty = t['Quantity']
-            revenue = qty * t['UnitPrice']
-
-            if p_name not in product_stats:
-                product_stats[p_name] = {'total_qty': 0, 'total_revenue': 0.0}
-
-            product_stats[p_name]['total_qty'] += qty
-            product_stats[p_name]['total_revenue'] += revenue
-
-        top_products = sorted(
-            [(name, data['total_qty'], data['total_revenue']) for name, data in product_stats.items()],
-            key=lambda x: x[2],
-            reverse=True
-        )[:5]
-
-        # customer analysis
-        customer_stats = {}
-        for t in transactions:
-            c_id = t['CustomerID']
-            amount = t['Quantity'] * t['UnitPrice']
-
-            if c_id not in customer_stats:
-                customer_stats[c_id] = {'total_spent': 0.0, 'purchase_count': 0}
-
-            customer_stats[c_id]['total_spent'] += amount
-            customer_stats[c_id]['purchase_count'] += 1
-
-        top_customers = sorted(
-            [(c_id, data['total_spent'], data['purchase_count']) for c_id, data in customer_stats.items()],
-            key=lambda x: x[1],
-            reverse=True
-        )[:5]
-
-        # daily sales trend
-        daily_stats = {}
-        for t in transactions:
-            date = t['Date']
-            amount = t['Quantity'] * t['UnitPrice']
-            c_id = t['CustomerID']
-
-            if date not in daily_stats:
-                daily_stats[date] = {'revenue': 0.0, 'transaction_count': 0, 'customers_set': set()}
-
-            daily_stats[date]['revenue'] += amount
-            daily_stats[date]['transaction_count'] += 1
-            daily_stats[date]['customers_set'].add(c_id)
-
-        sorted_dates = sorted(daily_stats.keys())
-
-        # peak sales day
-        peak_date = None
-        max_revenue = -1.0
-        for date, stats in daily_stats.items():
-            if stats['revenue'] > max_revenue:
-                max_revenue = stats['revenue']
-                peak_date = date
 
-        # low performing products
-        low_products = [(name, data['total_qty'], data['total_revenue'])
-                       for name, data in product_stats.items() if data['total_qty'] < 10]
-        low_products = sorted(low_products, key=lambda x: x[1])
+    Parameters:
+    - aggregates: prebuilt result of collect_all_stats() (optional)
+    """
 
-        # api enrichment analysis
-        api_enriched_count = sum(1 for t in enriched_transactions if t.get('API_Match', False))
-        total_enriched = len(enriched_transactions)
-        enrichment_rate = (api_enriched_count / total_enriched * 100) if total_enriched > 0 else 0.0
+    # timestamp taken once, at the start of the run
+    generated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    # calculate all required metrics
+    total_transactions = len(transactions)
+
+    if total_transactions == 0:
+        print("- No transactions to report")
+        return
+
+    # region, product, customer and daily totals come from the shared
+    # single-pass aggregation (see collect_all_stats for the slot layout)
+    if aggregates is None:
+        aggregates = collect_all_stats(transactions)
+
+    region_stats = aggregates.region
+    product_stats = aggregates.product
+    customer_stats = aggregates.customer
+    daily_stats = aggregates.daily
+    total_revenue = aggregates.total_revenue
+
+    avg_order_value = total_revenue / total_transactions if total_transactions > 0 else 0.0
+
+    # top 5 products by revenue and low performers (< 10 units) from one pass
+    product_rows = []
+    low_products = []
+    for name, (qty, revenue) in product_stats.items():
+        row = (name, qty, revenue)
+        product_rows.append(row)
+        if qty < 10:
+            low_products.append(row)
+
+    top_products = heapq.nlargest(5, product_rows, key=itemgetter(2))
+
+    # only the (small) low performer list gets sorted, lowest quantity first
+    low_products.sort(key=itemgetter(1))
+
+    # top 5 customers by total spent
+    top_customers = heapq.nlargest(
+        5,
+        ((c_id, spent, count) for c_id, (spent, count, _) in customer_stats.items()),
+        key=itemgetter(1)
+    )
+
+    # daily sales trend (its ends double as the report date range)
+    sorted_dates = sorted(daily_stats.keys())
+    date_range_start = sorted_dates[0]
+    date_range_end = sorted_dates[-1]
+
+    # peak sales day (found once by collect_all_stats)
+    peak_date = aggregates.peak_date
+    max_revenue = aggregates.peak_revenue
+
+    # api enrichment analysis (match count and unmatched products in one pass)
+    api_enriched_count = 0
+    unenriched_seen = {}  # dict keys stay unique and keep first-seen order
+    for t in enriched_transactions:
+        if t.get('API_Match', False):
+            api_enriched_count += 1
+        else:
+            unenriched_seen[t['ProductName']] = None
 
-        unenriched_products = [t['ProductName'] for t in enriched_transactions if not t.get('API_Match', False)]
-        unenriched_products = list(set(unenriched_products))  # unique products
+    total_enriched = len(enriched_transactions)
+    enrichment_rate = (api_enriched_count / total_enriched * 100) if total_enriched > 0 else 0.0
 
-        # build report content
-        report_lines = []
+    unenriched_products = list(unenriched_seen)
 
+    def render():
+        """
+        Yields the report text piece by piece, in report order
+        """
         # header
-        report_lines.append("=" * 50)
-        report_lines.append(" " * 10 + "SALES ANALYTICS REPORT")
-        report_lines.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        report_lines.append(f"Records Processed: {total_transactions}")
-        report_lines.append("=" * 50)
-        report_lines.append("")
+        yield (
+            f"{_EQ}\n"
+            f"{_TITLE}\n"
+            f"Generated: {generated_at}\n"
+            f"Records Processed: {total_transactions}\n"
+            f"{_EQ}\n"
+            "\n"
+        )
 
         # overall summary
-        report_lines.append("OVERALL SUMMARY")
-        report_lines.append("-" * 50)
-        report_lines.append(f"Total Revenue:        ₹{total_revenue:,.2f}")
-        report_lines.append(f"Total Transactions:   {total_transactions}")
-        report_lines.append(f"Average Order Value:  ₹{avg_order_value:,.2f}")
-        report_lines.append(f"Date Range:           {date_range_start} to {date_range_end}")
-        report_lines.append("")
+        yield (
+            "OVERALL SUMMARY\n"
+            f"{_SEP}\n"
+            f"Total Revenue:        ₹{total_revenue:,.2f}\n"
+            f"Total Transactions:   {total_transactions}\n"
+            f"Average Order Value:  ₹{avg_order_value:,.2f}\n"
+            f"Date Range:           {date_range_start} to {date_range_end}\n"
+            "\n"
+        )
 
         # region-wise performance
-        report_lines.append("REGION-WISE PERFORMANCE")
-        report_lines.append("-" * 50)
-        report_lines.append(f"{'Region':<15} {'Sales':<20} {'% of Total':<15} {'Transactions':<10}")
-        report_lines.append("-" * 50)
-
-        sorted_regions = sorted(region_stats.items(), key=lambda x: x[1]['total_sales'], reverse=True)
-        for region, stats in sorted_regions:
-            sales = stats['total_sales']
+        yield _REGION_HEAD
+
+        sorted_regions = sorted(region_stats.items(), key=lambda x: x[1][0], reverse=True)
+        for region, (sales, count) in sorted_regions:
             percentage = (sales / total_revenue * 100) if total_revenue > 0 else 0.0
-            count = stats['transaction_count']
-            report_lines.append(f"{region:<15} ₹{sales:>17,.2f}  {percentage:>6.2f}%      {count:>6}")
-        report_lines.append("")
+            yield _REGION_ROW(region, sales, percentage, count)
+        yield "\n"
 
         # top 5 products
-        report_lines.append("TOP 5 PRODUCTS")
-        report_lines.append("-" * 50)
-        report_lines.append(f"{'Rank':<6} {'Product Name':<25} {'Quantity':<10} {'Revenue':<15}")
-        report_lines.append("-" * 50)
-
+        yield _PRODUCT_HEAD
         for idx, (product, qty, revenue) in enumerate(top_products, 1):
-            report_lines.append(f"{idx:<6} {product:<25} {qty:<10} ₹{revenue:>12,.2f}")
-        report_lines.append("")
+            yield _PRODUCT_ROW(idx, product, qty, revenue)
+        yield "\n"
 
         # top 5 customers
-        report_lines.append("TOP 5 CUSTOMERS")
-        report_lines.append("-" * 50)
-        report_lines.append(f"{'Rank':<6} {'Customer ID':<15} {'Total Spent':<20} {'Order Count':<10}")
-        report_lines.append("-" * 50)
-
+        yield _CUSTOMER_HEAD
         for idx, (c_id, total_spent, order_count) in enumerate(top_customers, 1):
-            report_lines.append(f"{idx:<6} {c_id:<15} ₹{total_spent:>17,.2f}  {order_count:>6}")
-        report_lines.append("")
+            yield _CUSTOMER_ROW(idx, c_id, total_spent, order_count)
+        yield "\n"
 
         # daily sales trend
-        report_lines.append("DAILY SALES TREND")
-        report_lines.append("-" * 50)
-        report_lines.append(f"{'Date':<15} {'Revenue':<20} {'Transactions':<15} {'Unique Customers':<15}")
-        report_lines.append("-" * 50)
-
+        yield _DAILY_HEAD
         for date in sorted_dates:
-            stats = daily_stats[date]
-            revenue = stats['revenue']
-            count = stats['transaction_count']
-            customers = len(stats['customers_set'])
-            report_lines.append(f"{date:<15} ₹{revenue:>17,.2f}  {count:>6}           {customers:>6}")
-        report_lines.append("")
+            revenue, count, customers = daily_stats[date]
+            yield _DAILY_ROW(date, revenue, count, customers)
+        yield "\n"
 
         # product performance analysis
-        report_lines.append("PRODUCT PERFORMANCE ANALYSIS")
-        report_lines.append("-" * 50)
-        report_lines.append(f"Best Selling Day: {peak_date} with revenue ₹{max_revenue:,.2f}")
-        report_lines.append("")
+        yield (
+            "PRODUCT PERFORMANCE ANALYSIS\n"
+            f"{_SEP}\n"
+            f"Best Selling Day: {peak_date} with revenue ₹{max_revenue:,.2f}\n"
+            "\n"
+        )
 
         if low_products:
-            report_lines.append("Low Performing Products (< 10 units):")
+            yield "Low Performing Products (< 10 units):\n"
             for product, qty, revenue in low_products:
-                report_lines.append(f"  - {product}: {qty} units - ₹{revenue:,.2f}")
+                yield _LOW_PRODUCT_ROW(product, qty, revenue)
         else:
-            report_lines.append("No low performing products found")
+            yield "No low performing products found\n"
 
-        report_lines.append("")
-        report_lines.append("Average Transaction Value Per Region:")
+        yield "\nAverage Transaction Value Per Region:\n"
         for region in sorted(region_stats.keys()):
-            stats = region_stats[region]
-            avg_value = stats['total_sales'] / stats['transaction_count'] if stats['transaction_count'] > 0 else 0.0
-            report_lines.append(f"  - {region}: ₹{avg_value:,.2f}")
-        report_lines.append("")
+            sales, count = region_stats[region]
+            avg_value = sales / count if count > 0 else 0.0
+            yield _REGION_AVG_ROW(region, avg_value)
+        yield "\n"
 
         # api enrichment summary
-        report_lines.append("API ENRICHMENT SUMMARY")
-        report_lines.append("-" * 50)
-        report_lines.append(f"Total Products Enriched: {api_enriched_count}/{total_enriched}")
-        report_lines.append(f"Success Rate: {enrichment_rate:.2f}%")
+        yield (
+            "API ENRICHMENT SUMMARY\n"
+            f"{_SEP}\n"
+            f"Total Products Enriched: {api_enriched_count}/{total_enriched}\n"
+            f"Success Rate: {enrichment_rate:.2f}%\n"
+        )
 
         if unenriched_products:
-            report_lines.append(f"Unenriched Products ({len(unenriched_products)}):")
+            yield f"Unenriched Products ({len(unenriched_products)}):\n"
             for product in unenriched_products:
-                report_lines.append(f"  - {product}")
+                yield f"  - {product}\n"
         else:
-            report_lines.append("All Products Successfully Enriched")
-
-        report_lines.append("")
-        report_lines.append("=" * 50)
-        report_lines.append("END OF REPORT")
-        report_lines.append("=" * 50)
-
-        # write to file
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write("\n".join(report_lines))
+            yield "All Products Successfully Enriched\n"
 
-        print(f"✓ Sales Report Generated: {output_file}")
+        # footer
+        yield _FOOTER
 
-    except Exception as e:
+    # stream into a temp file first and swap it in only once it is complete,
+    # so a failure part-way through leaves the previous report untouched
+    tmp_file = output_file + '.tmp'
+    try:
+        # a 1 MiB buffer coalesces the many small writes into very few syscalls
+        with open(tmp_file, 'w', encoding='utf-8', buffering=1 << 20) as out:
+            out.writelines(render())
+        os.replace(tmp_file, output_file)
+
+    except (OSError, TypeError, ValueError) as e:
+        # TypeError/ValueError come from render() formatting a malformed value
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
         print(f"✗ Error Generating Report: {e}")
+        return
+
+    print(f"✓ Sales Report Generated: {output_file}")